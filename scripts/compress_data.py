@@ -4,15 +4,51 @@ Compress existing JSON detail files to gzip format.
 Much faster than regenerating all data.
 """
 
-import gzip
+import mmap
 import os
-import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from generate_data import gzip_open  # Same writer (backend, level, format) as fresh details
+
 PROJECT_DIR = Path(__file__).parent.parent
 DATA_DIR = PROJECT_DIR / "data"
 DETAILS_DIR = DATA_DIR / "details"
 
+
+def _compress_one(path_str: str) -> tuple:
+    """Compress a single JSON file to .json.gz and remove the original.
+
+    Top-level so it can be pickled into worker processes.
+
+    Returns:
+        tuple: (original_size, compressed_size)
+    """
+    json_file = Path(path_str)
+    gz_file = json_file.with_suffix('.json.gz')
+
+    original_size = json_file.stat().st_size
+
+    # Feed the compressor 1 MiB slices of a read-only mapping: no userspace copy
+    # of the input, pages are faulted in on demand (mmap rejects empty files)
+    with open(json_file, 'rb') as src, gzip_open(gz_file) as dst:
+        if original_size:
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for start in range(0, len(view), 1 << 20):
+                        dst.write(view[start:start + (1 << 20)])
+                finally:
+                    view.release()
+
+    compressed_size = gz_file.stat().st_size
+
+    # Remove original
+    json_file.unlink()
+    return original_size, compressed_size
+
+
 def main():
     print("=== Compressing detail files to gzip ===")
 
@@ -25,43 +61,47 @@ def main():
     original_size = 0
     compressed_size = 0
 
-    for repo_dir in sorted(DETAILS_DIR.iterdir()):
-        if not repo_dir.is_dir():
-            continue
-
-        json_files = list(repo_dir.glob("*.json"))
-        gz_files = list(repo_dir.glob("*.json.gz"))
+    # Collect pending files across all repos, so workers are kept busy
+    # regardless of how files are spread between repos
+    paths = []
+    with os.scandir(DETAILS_DIR) as entries:
+        repo_dirs = sorted(Path(entry.path) for entry in entries if entry.is_dir())
+
+    for repo_dir in repo_dirs:
+        # One directory pass, partitioned by suffix
+        json_files = []
+        gz_files = []
+        with os.scandir(repo_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json.gz"):
+                    gz_files.append(entry.path)
+                elif entry.name.endswith(".json"):
+                    json_files.append(entry.path)
 
         # Skip if already compressed
         if gz_files and not json_files:
             total_files += len(gz_files)
             continue
 
-        repo_original = 0
-        repo_compressed = 0
-
-        for json_file in json_files:
-            gz_file = json_file.with_suffix('.json.gz')
-
-            # Read and compress
-            content = json_file.read_bytes()
-            repo_original += len(content)
-
-            with gzip.open(gz_file, 'wb') as f:
-                f.write(content)
-
-            repo_compressed += gz_file.stat().st_size
+        paths.extend(json_files)
 
-            # Remove original
-            json_file.unlink()
+    # Each file is an independent CPU-bound deflate: compress them in parallel
+    repo_stats = defaultdict(lambda: [0, 0, 0])
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for path_str, (orig, comp) in zip(paths, executor.map(_compress_one, paths, chunksize=32)):
+            stats = repo_stats[Path(path_str).parent.name]
+            stats[0] += 1
+            stats[1] += orig
+            stats[2] += comp
             total_compressed += 1
 
-        if json_files:
-            ratio = (repo_compressed / repo_original * 100) if repo_original else 0
-            print(f"  {repo_dir.name}: {len(json_files)} files, {repo_original/1024/1024:.1f}MB -> {repo_compressed/1024/1024:.1f}MB ({ratio:.1f}%)")
-            original_size += repo_original
-            compressed_size += repo_compressed
-            total_files += len(json_files)
+    for repo_name in sorted(repo_stats):
+        file_count, repo_original, repo_compressed = repo_stats[repo_name]
+        ratio = (repo_compressed / repo_original * 100) if repo_original else 0
+        print(f"  {repo_name}: {file_count} files, {repo_original/1024/1024:.1f}MB -> {repo_compressed/1024/1024:.1f}MB ({ratio:.1f}%)")
+        original_size += repo_original
+        compressed_size += repo_compressed
+        total_files += file_count
 
     if original_size > 0:
         ratio = compressed_size / original_size * 100
@@ -1,23 +1,66 @@
 #!/usr/bin/env python3
 """
 Generate static JSON data from cloned legal code repositories.
-Uses git diff directly for fast diff computation.
+Streams batched `git log -p` output for fast diff computation.
 Strips metadata, handles HTML tags, and formats diffs by article.
 """
 
-import gzip
 import html
 import json
 import os
 import re
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from zlib_ng import gzip_ng as gzip  # Optional: faster deflate, same gzip stream format
+except ImportError:
+    import gzip
+
+try:
+    import orjson  # Optional: C JSON encoder, several times faster than json.dumps
+except ImportError:
+    orjson = None
+
 PROJECT_DIR = Path(__file__).parent.parent
 CODES_DIR = PROJECT_DIR / "codes"
 DATA_DIR = PROJECT_DIR / "data"
 
+# Detail files are small, one-off JSON: level 3 deflates them about 20% faster
+# than level 6 for about 5% more bytes (level 9 costs far more CPU for a few %)
+GZIP_LEVEL = 3
+
+# Worker processes for detail generation (diff parsing is CPU-bound Python)
+DETAIL_WORKERS = os.cpu_count() or 1
+
+# Minimum commits described by each `git log -p` invocation
+DETAIL_BATCH_SIZE = 50
+
+# Memoized entries per worker: short keys (lines, file names) and converted HTML,
+# which is kept smaller since each entry holds two full lines of text.
+# Workers are started per repository, so these caches never outlive a repo.
+STRING_CACHE_SIZE = 1 << 17
+HTML_CACHE_SIZE = 1 << 15
+
+# Bumped whenever get_commits output changes, so indexes of unchanged repos are rebuilt
+COMMITS_INDEX_VERSION = 2
+
+# Bumped whenever existing detail files must be rewritten. Version 2 diffs root
+# commits against the empty tree: their older details listed no files.
+DETAILS_VERSION = 2
+
+# Seconds without output after which a streamed git process is considered stuck
+# (streams have no overall timeout: a big batch legitimately runs for long)
+GIT_STALL_TIMEOUT = 120
+
+# Diff lines shorter than this are interned (long paragraphs rarely repeat)
+INTERN_MAX_LENGTH = 512
+
 # Metadata patterns to strip from diffs
 METADATA_PATTERNS = [
     r'^Nature:\s*',
@@ -38,30 +81,77 @@ METADATA_PATTERNS = [
     r'^Nouveaux textes:\s*$',
 ]
 
-METADATA_REGEX = re.compile('|'.join(METADATA_PATTERNS), re.IGNORECASE)
+# Lines that are just identifiers like LEGIARTI000045137090 (case-sensitive)
+IDENTIFIER_PATTERN = r'(?-i:^LEGI[A-Z]{4}\d{12}$)'
+
+# Git extended header lines that carry no content (---/+++ headers are handled apart)
+DIFF_HEADER_PREFIXES = ("index ", "new file mode", "deleted file mode", "similarity index", "rename from", "rename to")
+
+# Single pattern for all metadata checks: one regex run per line
+METADATA_REGEX = re.compile('|'.join(METADATA_PATTERNS + [IDENTIFIER_PATTERN]), re.IGNORECASE)
+
+# Characters a metadata line can start with, in either case ("L" also covers LEGI...).
+# IGNORECASE also equates the dotted and dotless I with "I", so they are kept too.
+METADATA_FIRST_CHARS = frozenset(
+    case(pattern.lstrip('^')[0]) for pattern in METADATA_PATTERNS for case in (str.lower, str.upper)
+) | {'\u0130', '\u0131'}
+
+# Content filters, compiled once (they run on every diff line)
+ARTICLE_HEADER_REGEX = re.compile(r'^Article\s+[A-Z]?\d+[A-Z0-9\-]*$', re.IGNORECASE)
+SEPARATOR_REGEX = re.compile(r'^[\-=]{3,}$')
+# Dated references: "YYYY-MM-DD CREE|MODIFIE|CITATION...", "YYYY-MM-DD cible|source",
+# "YYYY-MM-DD MODIFICATION source|cible"
+DATE_REFERENCE_REGEX = re.compile(
+    r'^\s*\d{4}-\d{2}-\d{2}\s+(?:CREE|MODIFIE|CITATION|cible|source|MODIFICATION\s+(?:source|cible))'
+)
+# Markdown link "* [Légifrance](URL)"; never spans lines, so a search over a
+# whole file finds the same link as a line-by-line search would
+LEGIFRANCE_LINK_REGEX = re.compile(r'\*[^\S\n]*\[L[ée]gifrance\]\(([^)\n]+)\)', re.IGNORECASE)
+
+# All tag rewrites in one pass: <br> -> newline, </p> -> paragraph break, any
+# other tag (including <p>, <a> and </a>, which leaves the link text) -> removed.
+# Tags never contain '<', so a stray '<' is left in place for the slow path.
+HTML_TAG_REGEX = re.compile(r'(<br\s*/?>)|(</p\s*>)|<[^<>]+>', re.IGNORECASE)
+
+# Replacement by matched group number (0: plain tag, 1: <br>, 2: </p>)
+HTML_TAG_REPLACEMENTS = ('', '\n', '\n\n')
+
+BLANK_LINES_REGEX = re.compile(r'\n{3,}')
+
+# Character references, matched exactly as html.unescape matches them
+CHARREF_REGEX = re.compile(r'&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)')
+
+# Decoded references, seeded with the ones legal texts use and filled on first sight
+ENTITY_TABLE = {
+    ref: html.unescape(ref)
+    for ref in ('&amp;', '&lt;', '&gt;', '&quot;', '&#39;', '&apos;', '&nbsp;', '&deg;',
+                '&eacute;', '&egrave;', '&ecirc;', '&agrave;', '&acirc;', '&ccedil;',
+                '&ocirc;', '&ucirc;', '&icirc;', '&iuml;', '&laquo;', '&raquo;', '&euro;')
+}
 
 
 def is_metadata_line(content: str) -> bool:
     """Check if a line is metadata that should be stripped."""
     stripped = content.strip()
-    if not stripped:
+    # One set lookup rejects the vast majority of lines before any regex runs
+    if not stripped or stripped[0] not in METADATA_FIRST_CHARS:
         return False
-    # Check against metadata patterns
-    if METADATA_REGEX.match(stripped):
-        return True
-    # Also match lines that are just identifiers like LEGIARTI000045137090
-    if re.match(r'^LEGI[A-Z]{4}\d{12}$', stripped):
-        return True
-    return False
+    return _matches_metadata(stripped)
 
 
-def html_to_text(content: str) -> str:
-    """Convert HTML content to plain text."""
-    if not content or '<' not in content:
-        return content
+@lru_cache(maxsize=STRING_CACHE_SIZE)
+def _matches_metadata(stripped: str) -> bool:
+    """Run METADATA_REGEX on a stripped line (memoized: boilerplate lines repeat a lot)."""
+    return bool(METADATA_REGEX.match(stripped))
+
 
-    text = content
+def _replace_html_tag(match: re.Match) -> str:
+    """Return the plain-text replacement for a tag matched by HTML_TAG_REGEX."""
+    return HTML_TAG_REPLACEMENTS[match.lastindex or 0]
 
+
+def _strip_html_tags_stepwise(text: str) -> str:
+    """Rewrite HTML tags one kind at a time (reference behaviour of HTML_TAG_REGEX)."""
     # Convert <br> and <br/> to newlines
     text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
 
@@ -75,20 +165,85 @@ def html_to_text(content: str) -> str:
     text = re.sub(r'<a\s+[^>]*>([^<]*)</a>', r'\1', text, flags=re.IGNORECASE)
 
     # Remove all other HTML tags but keep their content
-    text = re.sub(r'<[^>]+>', '', text)
+    return re.sub(r'<[^>]+>', '', text)
+
+
+def _decode_charref(match: re.Match) -> str:
+    """Return the text of a reference matched by CHARREF_REGEX."""
+    ref = match.group(0)
+    text = ENTITY_TABLE.get(ref)
+    if text is None:
+        # The match alone decodes exactly as it does in context
+        text = ENTITY_TABLE[ref] = html.unescape(ref)
+    return text
+
+
+def unescape_entities(text: str) -> str:
+    """Same result as html.unescape, with each distinct reference decoded once."""
+    return CHARREF_REGEX.sub(_decode_charref, text)
+
+
+@lru_cache(maxsize=HTML_CACHE_SIZE)
+def _convert_html(content: str) -> str:
+    """Convert HTML content to plain text.
+
+    Only worth calling on lines containing '<'. Memoized: the same markup recurs across commits.
+    """
+    text = HTML_TAG_REGEX.sub(_replace_html_tag, content)
+    if '<' in text:
+        # Stray '<' (e.g. "taux < 5 %"): the step-by-step rewrite treats it differently
+        text = _strip_html_tags_stepwise(content)
 
     # Decode HTML entities (e.g., &amp; -> &, &lt; -> <)
-    text = html.unescape(text)
+    if '&' in text:
+        text = unescape_entities(text)
 
     # Clean up excessive whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    if '\n\n\n' in text:
+        text = BLANK_LINES_REGEX.sub('\n\n', text)
     text = text.strip()
 
     return text
 
 
+def dumps_compact(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON (no spaces, non-ASCII kept as is)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def gzip_open(path: Path):
+    """Open a single-member gzip file for writing.
+
+    The browser inflates details with DecompressionStream('gzip'), which may
+    reject data after the first member: no multi-member (block-parallel) writer.
+    """
+    return gzip.open(path, 'wb', compresslevel=GZIP_LEVEL)
+
+
+def write_json_gz(path: Path, obj) -> None:
+    """Write obj as compact JSON into a gzip file.
+
+    The JSON is encoded in one C-speed call. Most details fit in one slice and
+    are compressed in a single gzip.compress call; larger ones are fed to the
+    compressor in 1 MiB slices so the compressed output is produced (and
+    flushed) piecewise instead of as a second file-sized buffer.
+    """
+    json_bytes = dumps_compact(obj)
+    if len(json_bytes) <= 1 << 20:
+        with open(path, 'wb') as f:
+            f.write(gzip.compress(json_bytes, compresslevel=GZIP_LEVEL))
+        return
+
+    view = memoryview(json_bytes)
+    with gzip_open(path) as f:
+        for start in range(0, len(view), 1 << 20):
+            f.write(view[start:start + (1 << 20)])
+
+
 def run_git(repo_path: Path, *args, timeout=30) -> str:
-    """Run a git command and return output."""
+    """Run a git command and return its whole output (for short outputs)."""
     try:
         result = subprocess.run(
             ["git", *args],
@@ -102,6 +257,136 @@ def run_git(repo_path: Path, *args, timeout=30) -> str:
         return ""
 
 
+class StallWatchdog:
+    """Kill a streamed git process whose output stops making progress.
+
+    Only the time the reader spends waiting on git counts: the reader calls
+    `pause()` before doing its own work with the output and `resume()` when it
+    goes back to reading. If git then writes nothing for GIT_STALL_TIMEOUT
+    seconds, the process is killed (the reader then sees end of output) and
+    `fired` is set so the reader can report it.
+    """
+
+    def __init__(self, proc: subprocess.Popen, timeout: float = GIT_STALL_TIMEOUT):
+        self.proc = proc
+        self.timeout = timeout
+        self.fired = False
+        self.paused = False
+        self.waiting_since = time.monotonic()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def _watch(self):
+        while not self._stopped.wait(min(self.timeout / 4, 5)):
+            if self.paused or time.monotonic() - self.waiting_since < self.timeout:
+                continue
+            if self.proc.poll() is None:
+                self.fired = True
+                self.proc.kill()
+            return
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.waiting_since = time.monotonic()
+        self.paused = False
+
+    def stop(self):
+        self._stopped.set()
+
+    def check(self, what: str):
+        """Raise if the process was killed for stalling."""
+        if self.fired:
+            raise RuntimeError(f"{what} produced no output for {self.timeout}s, killed")
+
+
+def iter_git(repo_path: Path, *args, stdin_lines=None, label: str = "git"):
+    """Run a git command and yield its output lines (without newline) as they are produced.
+
+    stdin_lines, if given, are written to git's standard input before reading
+    (for `--stdin` commands, which consume all input before writing anything).
+    label names the command in errors.
+    """
+    with subprocess.Popen(
+        ["git", *args],
+        cwd=repo_path,
+        stdin=subprocess.DEVNULL if stdin_lines is None else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1 << 16
+    ) as proc:
+        watchdog = StallWatchdog(proc)
+        try:
+            if stdin_lines is not None:
+                proc.stdin.write("".join(f"{line}\n" for line in stdin_lines))
+                proc.stdin.close()
+            watchdog.resume()
+            for line in proc.stdout:
+                # The consumer's own work between lines is not a git stall
+                watchdog.pause()
+                yield line.rstrip("\n")
+                watchdog.resume()
+        finally:
+            watchdog.stop()
+        watchdog.check(label)
+        # A stream cut short is not a complete last line: never let it through
+        if proc.wait() != 0:
+            raise RuntimeError(f"{label} exited with status {proc.returncode}")
+
+
+class GitPipe:
+    """Long-lived `git cat-file --batch` process, to read many objects with one git.
+
+    Usage:
+        with GitPipe(repo_path) as pipe:
+            content = pipe.read("HEAD:path/to/file.md")  # Or an object id
+    """
+
+    def __init__(self, repo_path: Path):
+        self.repo_path = repo_path
+        self.proc = None
+
+    def __enter__(self):
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self.watchdog = StallWatchdog(self.proc)
+        # Idle between reads: cat-file is waiting on us, not stalled
+        self.watchdog.pause()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.watchdog.stop()
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+        self.proc.wait()
+
+    def read(self, rev: str):
+        """Return the raw content of an object (e.g. "HEAD:file.md"), or None if missing."""
+        self.proc.stdin.write(rev.encode("utf-8") + b"\n")
+        self.proc.stdin.flush()
+
+        # Response: "<sha> <type> <size>\n<content>\n", or "<rev> missing\n"
+        self.watchdog.resume()
+        try:
+            header = self.proc.stdout.readline().split()
+            self.watchdog.check("git cat-file")
+            if len(header) != 3 or not header[2].isdigit():
+                return None
+            content = self.proc.stdout.read(int(header[2]))
+            self.proc.stdout.read(1)  # Trailing newline
+        finally:
+            self.watchdog.pause()
+        return content
+
+
 def build_legifrance_cache(repo_path: Path) -> dict:
     """Build a cache of Légifrance URLs for all articles at HEAD (current version).
 
@@ -110,42 +395,49 @@ def build_legifrance_cache(repo_path: Path) -> dict:
     """
     cache = {}
     try:
-        # Get all .md files in the repo
-        files_output = run_git(repo_path, "ls-files", "*.md")
-        files = [f for f in files_output.split('\n') if f.strip() and 'article_' in f]
-
-        for filename in files:
-            try:
-                # Read file content from HEAD
-                content = run_git(repo_path, "show", f"HEAD:{filename}")
-                if not content:
-                    continue
+        # Get all article .md files at HEAD, with their blob ids: each read below
+        # is then a direct object lookup instead of a path walk through HEAD's trees
+        articles = []
+        for entry in run_git(repo_path, "ls-tree", "-r", "HEAD").split('\n'):
+            # "<mode> <type> <sha>\t<path>"
+            meta, _, filename = entry.partition('\t')
+            if filename.endswith('.md') and 'article_' in filename and meta.split(' ')[1:2] == ['blob']:
+                articles.append((meta.rsplit(' ', 1)[-1], filename))
+
+        # Read every article through one cat-file process instead of one `git show` each
+        with GitPipe(repo_path) as pipe:
+            for blob_sha, filename in articles:
+                try:
+                    # Read file content from HEAD
+                    raw = pipe.read(blob_sha)
+                    if not raw:
+                        continue
+                    content = raw.decode("utf-8", errors="replace")
 
-                # Look for Légifrance link in "Autres formats" section
-                # Pattern: * [Légifrance](URL)
-                lines = content.split('\n')
-                for line in lines:
-                    # Match markdown link: * [Légifrance](URL)
-                    match = re.search(r'\*\s*\[L[ée]gifrance\]\(([^)]+)\)', line, re.IGNORECASE)
+                    # Look for Légifrance link in "Autres formats" section
+                    # (one search over the file, no list of lines)
+                    match = LEGIFRANCE_LINK_REGEX.search(content)
                     if match:
-                        legifrance_url = match.group(1)
-                        cache[filename] = legifrance_url
-                        break
-            except Exception:
-                continue
+                        cache[filename] = match.group(1)
+                except RuntimeError:
+                    raise  # Stalled cat-file: no point trying the other files
+                except Exception:
+                    continue
 
-    except Exception:
-        pass
+    except Exception as e:
+        print(f"  Warning: Légifrance URL cache incomplete: {e}")
 
     return cache
 
 
+@lru_cache(maxsize=None)
 def format_code_name(name: str) -> str:
     """Format repository name for display."""
     display = name.replace("_", " ")
     return display[0].upper() + display[1:] if display else display
 
 
+@lru_cache(maxsize=STRING_CACHE_SIZE)
 def format_article_name(filename: str) -> str:
     """Extract a readable article name from the filename."""
     # Example: partie_legislative/livre_premier/.../article_l1234-5.md -> Article L1234-5
@@ -236,8 +528,12 @@ def get_repos() -> list:
     if not CODES_DIR.exists():
         return repos
 
-    for item in sorted(CODES_DIR.iterdir()):
-        if item.is_dir() and (item / ".git").exists():
+    # scandir gives each entry type without a stat call
+    with os.scandir(CODES_DIR) as entries:
+        repo_dirs = sorted(Path(entry.path) for entry in entries if entry.is_dir())
+
+    for item in repo_dirs:
+        if (item / ".git").exists():
             # Try to extract real title from README.md
             display_name = format_code_name(item.name)  # fallback
             readme_path = item / "README.md"
@@ -258,64 +554,134 @@ def get_repos() -> list:
     return repos
 
 
+def read_nul_tokens(stream, chunk_size: int = 1 << 16):
+    """Yield NUL-separated tokens from a text stream as it is produced."""
+    pending = ""
+    for chunk in iter(lambda: stream.read(chunk_size), ""):
+        tokens = (pending + chunk).split("\0")
+        pending = tokens.pop()
+        yield from tokens
+    if pending:
+        yield pending
+
+
 def get_commits(repo_path: Path) -> list:
-    """Get all commits for a repository with file count."""
-    # Get commit info with numstat for file count
-    log_output = run_git(repo_path, "log", "--format=%H|%aI|%s", "--all", timeout=120)
+    """Get all commits for a repository with file count.
 
-    commits = []
-    for line in log_output.split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("|", 2)
-        if len(parts) >= 3:
-            sha, date_str, message = parts
-            # Get file count for this commit (exclude README.md files)
-            files_output = run_git(repo_path, "diff-tree", "--no-commit-id", "-r", "--name-only", sha)
-            file_count = len([f for f in files_output.split("\n") if f.strip() and not f.lower().endswith("readme.md")])
-
-            commits.append({
-                "sha": sha[:12],
-                "fullSha": sha,  # Keep full SHA for API requests
-                "date": date_str.split("T")[0],
-                "message": message[:300],
-                "files": file_count
-            })
+    Reads a single streamed `git log --name-only -z` instead of running
+    `git diff-tree` once per commit.
+    """
+    # Records look like: \0<sha>|<date>|<subject>\0 then \n<path>\0<path>\0...
+    # Renames are split into delete + add; root commits list every file they add.
+    proc = subprocess.Popen(
+        ["git", "-c", "log.showRoot=true", "log", "--all", "--no-renames", "--author-date-order",
+         "--format=%x00%H|%aI|%s", "--name-only", "-z"],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf-8",
+        errors="replace"
+    )
 
+    commits = []
+    current = None
+    expect_header = False
+    watchdog = StallWatchdog(proc)
+    with proc:
+        try:
+            for token in read_nul_tokens(proc.stdout):
+                watchdog.resume()
+                if expect_header:
+                    expect_header = False
+                    current = None
+                    parts = token.split("|", 2)
+                    if len(parts) >= 3:
+                        sha, date_str, message = parts
+                        current = {
+                            "sha": sha[:12],
+                            "fullSha": sha,  # Keep full SHA for API requests
+                            "date": date_str.split("T")[0],
+                            "message": message[:300],
+                            "files": 0
+                        }
+                        commits.append(current)
+                elif not token:
+                    # Empty token: the next one is a commit header
+                    expect_header = True
+                elif current and not token.lower().endswith("readme.md"):
+                    # Count changed files (exclude README.md files); the first path
+                    # carries the newline after the header, which endswith ignores
+                    current["files"] += 1
+        finally:
+            watchdog.stop()
+    watchdog.check("git log")
+    if proc.returncode != 0:
+        raise RuntimeError(f"git log exited with status {proc.returncode}")
+
+    # Git already emits newest first by author date, so this stable sort is a
+    # single linear pass; it only reorders the rare child dated before its parent
     commits.sort(key=lambda x: x["date"], reverse=True)
     return commits
 
 
-def get_commit_diff(repo_path: Path, sha: str, legifrance_cache: dict = None) -> dict:
-    """Get diff for a commit using git diff.
+def get_refs_fingerprint(repo_path: Path) -> str:
+    """Return HEAD and every ref with its target: it changes whenever `git log --all` would."""
+    refs = run_git(repo_path, "show-ref", "--head")
+    # The index version invalidates indexes written by an older get_commits
+    return f"index v{COMMITS_INDEX_VERSION}\n{refs}" if refs else ""
 
-    Args:
-        repo_path: Path to the repository
-        sha: Commit SHA
-        legifrance_cache: Optional cache of filename -> legifrance_url mappings
-    """
-    # Get commit message
-    message = run_git(repo_path, "log", "-1", "--format=%s", sha)
-    date = run_git(repo_path, "log", "-1", "--format=%aI", sha).split("T")[0]
 
-    # Get changed files
-    files_output = run_git(repo_path, "diff-tree", "--no-commit-id", "-r", "--name-status", sha)
+def stream_commit_logs(repo_path: Path, shas: list):
+    """Split a single streamed `git log -p` over several commits into per-commit parts.
 
-    files = []
-    for line in files_output.split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("\t", 1)
-        if len(parts) == 2:
-            status_code, filename = parts
-            status = "added" if status_code == "A" else "deleted" if status_code == "D" else "modified"
-            files.append({"status": status, "filename": filename})
+    Replaces four git invocations per commit (message, date, changed files
+    and diff) with one process for the whole batch, parsed as git writes it.
+
+    Args:
+        repo_path: Path to the repository
+        shas: Commit SHAs to describe
 
-    # Get unified diff
-    diff_output = run_git(repo_path, "diff", f"{sha}^..{sha}", "--", timeout=60)
+    Yields:
+        tuple: (header, files_status, diff_lines) per commit, in the same order as `shas`
+    """
+    # Each commit is a "\0<sha> <date> <subject>" header, then --raw lines
+    # (":<modes> <blobs> <status>\t<path>[\t<new path>]"), then the patch.
+    # Merges are diffed against their first parent, root commits against the empty tree.
+    # SHAs go through stdin, so a batch is not bounded by the command line length.
+    log_lines = iter_git(
+        repo_path, "-c", "log.showRoot=true", "log", "--no-walk=unsorted", "--diff-merges=first-parent",
+        "--raw", "-p", "--format=%x00%H %aI %s", "--stdin", stdin_lines=shas, label="git log -p"
+    )
+
+    header = None
+    files_status = {}
+    diff_lines = []
+    for line in log_lines:
+        if line.startswith("\0"):
+            if header is not None:
+                yield header, files_status, diff_lines
+            header = line[1:]
+            files_status = {}
+            diff_lines = []
+        elif diff_lines or line.startswith("diff --git"):
+            diff_lines.append(line)
+        elif line.startswith(":") and "\t" in line:
+            meta, *paths = line.split("\t")
+            status_code = meta.rsplit(" ", 1)[-1][:1]
+            # A rename/copy target is a new file, as plain diff-tree reports it
+            status = "added" if status_code in ("A", "R", "C") else "deleted" if status_code == "D" else "modified"
+            files_status[paths[-1]] = status
+
+    if header is not None:
+        yield header, files_status, diff_lines
+
+
+def make_commit_detail(header: str, files_status: dict, diff_lines: list, legifrance_cache: dict = None) -> dict:
+    """Build a commit detail from its log header, changed files' status and diff lines."""
+    sha, date_str, message = header.split(" ", 2)
 
     # Parse diff into structured format (include full context for before/after view)
-    file_diffs = parse_unified_diff(diff_output, files, legifrance_cache, include_context=True)
+    file_diffs = parse_unified_diff(diff_lines, files_status, legifrance_cache, include_context=True)
 
     # Calculate stats
     total_add = sum(f.get("additions", 0) for f in file_diffs)
@@ -324,7 +690,7 @@ def get_commit_diff(repo_path: Path, sha: str, legifrance_cache: dict = None) ->
     return {
         "sha": sha[:12],
         "fullSha": sha,
-        "date": date,
+        "date": date_str.split("T")[0],
         "message": message,
         "files": file_diffs,
         "stats": {
@@ -339,7 +705,7 @@ def is_article_header(content: str) -> bool:
     """Check if line is just the article number (e.g., 'Article R4137-48')."""
     stripped = content.strip()
     # Match "Article" followed by alphanumeric code (e.g., R4137-48, L123-4)
-    return bool(re.match(r'^Article\s+[A-Z]?\d+[A-Z0-9\-]*$', stripped, re.IGNORECASE))
+    return bool(ARTICLE_HEADER_REGEX.match(stripped))
 
 
 def is_section_header(content: str) -> bool:
@@ -366,7 +732,7 @@ def should_skip_content(content: str) -> bool:
         return False
 
     # Skip markdown separators (---, ===, etc.)
-    if re.match(r'^[\-=]{3,}$', stripped):
+    if SEPARATOR_REGEX.match(stripped):
         return True
 
     # Skip article header (redundant with title)
@@ -403,12 +769,9 @@ def should_skip_content(content: str) -> bool:
         if " cible" in stripped or " source" in stripped:
             return True
 
-    # Skip date-based references (YYYY-MM-DD followed by CREE/MODIFIE/CITATION)
-    if re.match(r'^\d{4}-\d{2}-\d{2}\s+(CREE|MODIFIE|CITATION)', stripped):
-        return True
-
-    # Skip special date references
-    if re.match(r'^\s*\d{4}-\d{2}-\d{2}\s+(cible|source)', stripped):
+    # Skip date-based references (YYYY-MM-DD followed by CREE/MODIFIE/CITATION,
+    # cible/source, or MODIFICATION source/cible)
+    if DATE_REFERENCE_REGEX.match(stripped):
         return True
 
     # Skip lines that look like article references
@@ -431,48 +794,89 @@ def should_skip_content(content: str) -> bool:
     if "CONCORDANCE" in stripped and any(keyword in stripped for keyword in ["cible", "source"]):
         return True
 
-    # Skip date-based MODIFICATION/CITATION source references (e.g., "2024-10-18 MODIFICATION source Décision...")
-    if re.match(r'^\d{4}-\d{2}-\d{2}\s+(MODIFICATION|CITATION|MODIFIE|CREE)\s+(source|cible)', stripped):
-        return True
-
     return False
 
 
-def parse_unified_diff(diff_text: str, files_info: list, legifrance_cache: dict = None, include_context: bool = False) -> list:
+def _make_file_diff(filename: str, additions: int, deletions: int, diff: list,
+                    files_status: dict, legifrance_cache: dict = None) -> dict:
+    """Build the published record of one file's diff from its (type, content) tuples."""
+    # Collapse multiple consecutive empty lines into one,
+    # expanding the tuples into the published dict form
+    collapsed_diff = []
+    last_was_empty = False
+    for line_type, content in diff:
+        is_empty = not content.strip()
+
+        if is_empty and last_was_empty:
+            # Skip this empty line
+            continue
+
+        collapsed_diff.append({"type": line_type, "content": content})
+        last_was_empty = is_empty
+
+    return {
+        "filename": filename,
+        "articleName": format_article_name(filename),
+        # Get Légifrance URL from cache
+        "legifranceUrl": legifrance_cache.get(filename, "") if legifrance_cache else "",
+        "additions": additions,
+        "deletions": deletions,
+        "diff": collapsed_diff,
+        "status": files_status.get(filename, "modified")
+    }
+
+
+def parse_unified_diff(diff_lines, files_status: dict, legifrance_cache: dict = None, include_context: bool = False) -> list:
     """Parse unified diff output into structured format, filtering metadata.
 
     Args:
-        diff_text: Raw unified diff output
-        files_info: List of file info dicts with status
+        diff_lines: Iterable of raw unified diff lines (without newline)
+        files_status: Mapping of filename -> status (added, deleted, modified)
         legifrance_cache: Optional cache of filename -> legifrance_url mappings
         include_context: If False, skip unchanged lines to save space
     """
     file_diffs = []
     current_file = None
-    current_diff = []
+    current_diff = []  # (type, content) tuples: far lighter than one dict per line
     additions = 0
     deletions = 0
     skip_details = False  # Track if we're inside <details> tag
     before_article = True  # Track if we're before the article header
     in_reference_section = False  # Track if we're in a reference section
 
-    for line in diff_text.split("\n"):
-        if line.startswith("diff --git"):
+    for line in diff_lines:
+        # Dispatch on the first character, most frequent kinds first: content
+        # lines settle in one or two comparisons, file headers come last
+        c = line[:1]
+
+        if c == "+":
+            if not line.startswith("+++"):
+                line_type = "add"
+            elif line.startswith("+++ b/"):
+                continue  # Git diff header
+            else:
+                line_type = "unchanged"  # Other "+++" lines are handled as context
+        elif c == "-":
+            if not line.startswith("---"):
+                line_type = "del"
+            elif line.startswith("--- a/") or line == "--- /dev/null":
+                continue  # Git diff header
+            else:
+                line_type = "unchanged"  # Other "---" lines are handled as context
+        elif c == " ":
+            line_type = "unchanged"  # Context line: no header starts with a space
+        elif c == "@" and line.startswith("@@"):
+            # Reset flags on new hunk
+            before_article = False
+            skip_details = False
+            in_reference_section = False
+            continue
+        elif c == "d" and line.startswith("diff --git"):
             # Save previous file
             if current_file and not current_file.lower().endswith("readme.md"):
-                # Get Légifrance URL from cache
-                legifrance_url = ""
-                if legifrance_cache and current_file in legifrance_cache:
-                    legifrance_url = legifrance_cache[current_file]
-
-                file_diffs.append({
-                    "filename": current_file,
-                    "articleName": format_article_name(current_file),
-                    "legifranceUrl": legifrance_url,
-                    "additions": additions,
-                    "deletions": deletions,
-                    "diff": current_diff
-                })
+                file_diffs.append(_make_file_diff(
+                    current_file, additions, deletions, current_diff, files_status, legifrance_cache
+                ))
 
             # Extract filename
             parts = line.split(" b/")
@@ -483,198 +887,117 @@ def parse_unified_diff(diff_text: str, files_info: list, legifrance_cache: dict
             skip_details = False
             before_article = True
             in_reference_section = False
-
-        # Skip git diff metadata headers
-        elif line.startswith("index ") or line.startswith("--- a/") or line.startswith("+++ b/") or line.startswith("new file mode") or line.startswith("deleted file mode") or line.startswith("similarity index") or line.startswith("rename from") or line.startswith("rename to") or line == "--- /dev/null":
             continue
+        elif c == "\\" or line.startswith(DIFF_HEADER_PREFIXES):
+            continue
+        else:
+            line_type = "unchanged"
 
-        elif current_file and line.startswith("+") and not line.startswith("+++"):
-            content = line[1:]
-            stripped = content.strip()
-
-            # Track <details> tag
-            if "<details>" in stripped or stripped.startswith("<details"):
-                skip_details = True
-                continue
-            if "</details>" in stripped:
-                skip_details = False
-                continue
-            if skip_details:
-                continue
-
-            # Track reference sections
-            if stripped.startswith("### Textes faisant référence") or stripped.startswith("### Articles faisant référence"):
-                in_reference_section = True
-                continue
-            if in_reference_section:
-                # End reference section when we hit a new heading or empty line after references
-                if stripped.startswith("#") and not stripped.startswith("###"):
-                    in_reference_section = False
-                else:
-                    continue
-
-            # Track article header - skip metadata before article
-            if stripped.startswith("# Article "):
-                before_article = False
-                in_reference_section = False  # Reset when we see article header
-                continue  # Skip the article header itself
-            if before_article:
-                continue  # Skip all metadata before article
-
-            # Skip metadata lines
-            if is_metadata_line(content):
-                continue
+        if not current_file:
+            continue
 
-            # Skip individual content that should be filtered
-            if should_skip_content(content):
+        if line_type == "unchanged":
+            # Only include context lines if requested (saves significant space)
+            if not include_context or not line:
                 continue
-
-            # Convert HTML to plain text
-            content = html_to_text(content)
-            if content.strip():  # Only add non-empty lines
-                additions += 1
-                current_diff.append({"type": "add", "content": content})
-
-        elif current_file and line.startswith("-") and not line.startswith("---"):
+            content = line[1:] if c == " " else line
+        else:
             content = line[1:]
-            stripped = content.strip()
+        stripped = content.strip()
 
-            # Track <details> tag
-            if "<details>" in stripped or stripped.startswith("<details"):
-                skip_details = True
-                continue
-            if "</details>" in stripped:
-                skip_details = False
-                continue
-            if skip_details:
-                continue
+        # Track <details> tag
+        if "<details>" in stripped or stripped.startswith("<details"):
+            skip_details = True
+            continue
+        if "</details>" in stripped:
+            skip_details = False
+            continue
+        if skip_details:
+            continue
 
-            # Track reference sections
-            if stripped.startswith("### Textes faisant référence") or stripped.startswith("### Articles faisant référence"):
-                in_reference_section = True
+        # Track reference sections
+        if stripped.startswith("### Textes faisant référence") or stripped.startswith("### Articles faisant référence"):
+            in_reference_section = True
+            continue
+        if in_reference_section:
+            # End reference section when we hit a new heading or empty line after references
+            if stripped.startswith("#") and not stripped.startswith("###"):
+                in_reference_section = False
+            else:
                 continue
-            if in_reference_section:
-                # End reference section when we hit a new heading or empty line after references
-                if stripped.startswith("#") and not stripped.startswith("###"):
-                    in_reference_section = False
-                else:
-                    continue
 
-            # Track article header - skip metadata before article
-            if stripped.startswith("# Article "):
-                before_article = False
-                in_reference_section = False  # Reset when we see article header
-                continue  # Skip the article header itself
-            if before_article:
-                continue  # Skip all metadata before article
+        # Track article header - skip metadata before article
+        if stripped.startswith("# Article "):
+            before_article = False
+            in_reference_section = False  # Reset when we see article header
+            continue  # Skip the article header itself
+        if before_article:
+            continue  # Skip all metadata before article
 
-            # Skip metadata lines
-            if is_metadata_line(content):
-                continue
+        # Skip metadata lines (in context too)
+        if is_metadata_line(content):
+            continue
 
-            # Skip individual content that should be filtered
-            if should_skip_content(content):
-                continue
+        # Skip individual content that should be filtered
+        if should_skip_content(content):
+            continue
 
-            # Convert HTML to plain text
-            content = html_to_text(content)
-            if content.strip():  # Only add non-empty lines
+        # Convert HTML to plain text (inlined guard: most lines carry no tag)
+        if '<' in content:
+            content = _convert_html(content)
+        if content.strip():  # Only add non-empty lines
+            if len(content) < INTERN_MAX_LENGTH:
+                # Boilerplate lines recur across files: keep one copy of each
+                content = sys.intern(content)
+            if line_type == "add":
+                additions += 1
+            elif line_type == "del":
                 deletions += 1
-                current_diff.append({"type": "del", "content": content})
-
-        elif include_context and current_file and not line.startswith("@@") and not line.startswith("\\"):
-            # Only include context lines if requested (saves significant space)
-            if line:
-                content = line[1:] if line.startswith(" ") else line
-                stripped = content.strip()
-
-                # Track <details> tag
-                if "<details>" in stripped or stripped.startswith("<details"):
-                    skip_details = True
-                    continue
-                if "</details>" in stripped:
-                    skip_details = False
-                    continue
-                if skip_details:
-                    continue
+            current_diff.append((line_type, content))
 
-                # Track reference sections
-                if stripped.startswith("### Textes faisant référence") or stripped.startswith("### Articles faisant référence"):
-                    in_reference_section = True
-                    continue
-                if in_reference_section:
-                    # End reference section when we hit a new heading or empty line after references
-                    if stripped.startswith("#") and not stripped.startswith("###"):
-                        in_reference_section = False
-                    else:
-                        continue
-
-                # Track article header - skip metadata before article
-                if stripped.startswith("# Article "):
-                    before_article = False
-                    in_reference_section = False  # Reset when we see article header
-                    continue  # Skip the article header itself
-                if before_article:
-                    continue  # Skip all metadata before article
+    # Save last file (skip README.md files)
+    if current_file and not current_file.lower().endswith("readme.md"):
+        file_diffs.append(_make_file_diff(
+            current_file, additions, deletions, current_diff, files_status, legifrance_cache
+        ))
 
-                # Skip metadata lines in context too
-                if is_metadata_line(content):
-                    continue
+    return file_diffs
 
-                # Skip individual content that should be filtered
-                if should_skip_content(content):
-                    continue
 
-                # Convert HTML to plain text
-                content = html_to_text(content)
-                if content.strip():  # Only add non-empty lines
-                    current_diff.append({"type": "unchanged", "content": content})
+def _process_batch(repo_path: str, repo_details_dir: str, shas: list, legifrance_cache: dict) -> int:
+    """Generate the gzip-compressed detail files for a batch of commits.
 
-        # Reset flags on new hunk
-        if line.startswith("@@"):
-            before_article = False
-            skip_details = False
-            in_reference_section = False
+    Top-level with plain arguments so it can be pickled into worker processes.
 
-    # Save last file (skip README.md files)
-    if current_file and not current_file.lower().endswith("readme.md"):
-        # Get Légifrance URL from cache
-        legifrance_url = ""
-        if legifrance_cache and current_file in legifrance_cache:
-            legifrance_url = legifrance_cache[current_file]
-
-        file_diffs.append({
-            "filename": current_file,
-            "articleName": format_article_name(current_file),
-            "legifranceUrl": legifrance_url,
-            "additions": additions,
-            "deletions": deletions,
-            "diff": current_diff
-        })
-
-    # Add status from files_info
-    files_dict = {f["filename"]: f["status"] for f in files_info}
-    for fd in file_diffs:
-        fd["status"] = files_dict.get(fd["filename"], "modified")
-
-    # Collapse multiple consecutive empty lines into one for each file
-    for fd in file_diffs:
-        collapsed_diff = []
-        last_was_empty = False
-
-        for line in fd["diff"]:
-            is_empty = not line.get("content", "").strip()
-
-            if is_empty and last_was_empty:
-                # Skip this empty line
+    Returns:
+        int: Number of detail files written
+    """
+    repo_path = Path(repo_path)
+    repo_details_dir = Path(repo_details_dir)
+    written = 0
+    pending = set(shas)
+    try:
+        for header, files_status, diff_lines in stream_commit_logs(repo_path, shas):
+            sha = header.split(" ", 1)[0]
+            pending.discard(sha)
+            try:
+                detail = make_commit_detail(header, files_status, diff_lines, legifrance_cache)
+            except Exception as e:
+                print(f"  Warning: Failed to get diff for {sha[:12]}: {e}")
                 continue
+            try:
+                # Save as gzip-compressed JSON
+                write_json_gz(repo_details_dir / f"{sha[:12]}.json.gz", detail)
+                written += 1
+            except Exception as e:
+                print(f"  Warning: Failed to save diff for {sha[:12]}: {e}")
+    except RuntimeError as e:
+        # Git failed: the commit it was writing is incomplete, so it stays pending
+        print(f"  Warning: {e}")
 
-            collapsed_diff.append(line)
-            last_was_empty = is_empty
-
-        fd["diff"] = collapsed_diff
-
-    return file_diffs
+    for sha in pending:
+        print(f"  Warning: Failed to get diff for {sha[:12]}")
+    return written
 
 
 def main():
@@ -707,47 +1030,106 @@ def main():
 
         print(f"\n[{idx+1}/{len(repos)}] {repo_name}")
 
-        commits = get_commits(repo_path)
-        print(f"  {len(commits)} commits")
+        # Reuse the commits index when no ref moved since it was written:
+        # walking the whole history again would give the same result.
+        # The fingerprint lives in the clone's .git, outside the published data/,
+        # and records the index mtime so a replaced index is never trusted.
+        index_file = commits_dir / f"{repo_name}.json"
+        refs_file = repo_path / ".git" / "evolution_du_droit.refs"
+        refs = get_refs_fingerprint(repo_path) if refs_file.parent.is_dir() else ""
+        up_to_date = (
+            bool(refs) and index_file.exists() and refs_file.exists()
+            and refs_file.read_text() == f"{refs}\nindex mtime {index_file.stat().st_mtime_ns}"
+        )
+        if up_to_date:
+            with open(index_file, "rb") as f:
+                commits = json.loads(f.read())
+        else:
+            try:
+                commits = get_commits(repo_path)
+            except RuntimeError as e:
+                print(f"  Warning: Failed to list commits: {e}")
+                continue
+        print(f"  {len(commits)} commits{' (unchanged)' if up_to_date else ''}")
         total_commits += len(commits)
 
         if not commits:
             continue
 
-        # Save commits index (compact JSON)
-        with open(commits_dir / f"{repo_name}.json", "w", encoding="utf-8") as f:
-            json.dump(commits, f, ensure_ascii=False, separators=(',', ':'))
-
-        # Build Légifrance URL cache once for this repo (much faster than per-commit)
-        print(f"  Building Légifrance URL cache...")
-        legifrance_cache = build_legifrance_cache(repo_path)
-        print(f"  Cached {len(legifrance_cache)} article URLs")
+        if not up_to_date:
+            # Save commits index (compact JSON), then the refs it was built from
+            with open(index_file, "wb") as f:
+                f.write(dumps_compact(commits))
+            if refs:
+                refs_file.write_text(f"{refs}\nindex mtime {index_file.stat().st_mtime_ns}")
 
         # Generate details for each commit
         repo_details_dir = details_dir / repo_name
         repo_details_dir.mkdir(exist_ok=True)
 
-        for i, commit in enumerate(commits):
-            sha = commit["fullSha"]
-            detail_file = repo_details_dir / f"{sha[:12]}.json.gz"
+        # Skip already generated commits (one directory listing, not one stat per commit)
+        with os.scandir(repo_details_dir) as entries:
+            existing = {entry.name[:-8] for entry in entries if entry.name.endswith(".json.gz")}
 
-            # Skip if already generated
-            if detail_file.exists():
+        # Details written before DETAILS_VERSION are regenerated once: the
+        # version they were brought to is recorded next to the refs fingerprint
+        details_file = refs_file.parent / "evolution_du_droit.details"
+        details_version = f"details v{DETAILS_VERSION}"
+        stale_details = refs_file.parent.is_dir() and (
+            not details_file.exists() or details_file.read_text() != details_version
+        )
+        if stale_details:
+            roots = run_git(repo_path, "rev-list", "--max-parents=0", "--all").split()
+            existing.difference_update(sha[:12] for sha in roots)
+            # No root means git failed: leave the version unrecorded to retry next run
+            stale_details = bool(roots)
+
+        pending = []
+        for commit in commits:
+            if commit["sha"] in existing:
                 total_details += 1
-                continue
+            else:
+                pending.append(commit["fullSha"])
 
-            try:
-                detail = get_commit_diff(repo_path, sha, legifrance_cache)
-                # Save as gzip-compressed JSON
-                json_bytes = json.dumps(detail, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
-                with gzip.open(detail_file, 'wb') as f:
-                    f.write(json_bytes)
-                total_details += 1
+        if not pending:
+            print(f"  All {len(commits)} detail files up to date")
+            if stale_details:
+                details_file.write_text(details_version)
+            continue
 
-                if (i + 1) % 100 == 0:
-                    print(f"    {i+1}/{len(commits)} commits processed")
-            except Exception as e:
-                print(f"  Warning: Failed to get diff for {sha[:12]}: {e}")
+        # Build Légifrance URL cache once for this repo (much faster than per-commit)
+        print(f"  Building Légifrance URL cache...")
+        legifrance_cache = build_legifrance_cache(repo_path)
+        print(f"  Cached {len(legifrance_cache)} article URLs")
+
+        # One git process per batch, parsed in its own worker process (the
+        # parsing holds the GIL, so threads would serialize on it). A cold repo
+        # is split into a few long streams per worker rather than many small
+        # batches, so git walks history in few passes while load stays balanced.
+        batch_size = max(DETAIL_BATCH_SIZE, -(-len(pending) // (DETAIL_WORKERS * 4)))
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        done = len(commits) - len(pending)
+        written = 0
+        with ProcessPoolExecutor(max_workers=min(DETAIL_WORKERS, len(batches) or 1)) as executor:
+            futures = {
+                executor.submit(_process_batch, str(repo_path), str(repo_details_dir), batch, legifrance_cache): len(batch)
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                try:
+                    written += future.result()
+                except Exception as e:
+                    # A failed batch (git error, dead worker...) only loses its own commits
+                    print(f"  Warning: Failed to process a batch of {futures[future]} commits: {e}")
+
+                previous, done = done, done + futures[future]
+                if done // 100 > previous // 100:
+                    print(f"    {done}/{len(commits)} commits processed")
+
+        total_details += written
+        if stale_details and written == len(pending):
+            # Otherwise an old detail may remain: check again on the next run
+            details_file.write_text(details_version)
 
         print(f"  Generated {len(commits)} detail files")
 
@@ -28,11 +28,8 @@ def get_detail_codes():
     if not DETAILS_DIR.exists():
         return []
 
-    codes = []
-    for dir in sorted(DETAILS_DIR.iterdir()):
-        if dir.is_dir():
-            codes.append(dir.name)
-    return codes
+    with os.scandir(DETAILS_DIR) as entries:
+        return sorted(entry.name for entry in entries if entry.is_dir())
 
 def get_detail_count(code_name):
     """Get count of detail files for a code."""